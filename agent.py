@@ -1,23 +1,45 @@
 #!/usr/bin/env python3
 """
 Agent VM - Minimalist agentic coding tool
-Usage: python agent.py [init|edit|build]
+Usage: python agent.py [init|edit|build [--continue <linode_id> | --count <n>]|pool --size <n>]
+       ('pool --size 0' deletes every pooled VM)
 """
 
+from __future__ import annotations
+
 import os
 import json
+import operator
 import time
+import random
+import re
+import shlex
+import socket
 import secrets
 import string
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, reduce
 from pathlib import Path
-from typing import TypedDict
+from typing import TYPE_CHECKING, TypedDict
+
+# linode_api4 pulls in requests/urllib3, so it's imported on first use rather than
+# at startup; the usage/help paths never need it
+if TYPE_CHECKING:
+    from linode_api4 import Instance, Image
 
-try:
-    from linode_api4 import LinodeClient, Instance, Image
-except ImportError:
-    print("Please install: pip install linode-api4")
-    exit(1)
+# Shell -> profile file (relative to ~) that LINODE_TOKEN gets added to
+_PROFILE_FILES = {
+    'zsh': '.zshrc',
+    'bash': '.bashrc',
+    'fish': '.config/fish/config.fish',
+}
+
+def _generate_root_password(length=64):
+    """Random root password (same alphabet as linode_api4's generator, without importing it)"""
+    alphabet = string.ascii_letters + string.digits + string.punctuation
+    return ''.join(secrets.choice(alphabet) for _ in range(length))
 
 class Config(TypedDict):
     repo_name: str
@@ -27,17 +49,123 @@ class Config(TypedDict):
     root_password: str
 
 class AgentVM:
+    # Linode processes at most 5 concurrent creates per account
+    _create_slots = threading.Semaphore(5)
+    # Wall-clock cap on an interactive session before its VM is saved and destroyed,
+    # so a forgotten one stops billing. This process can't see activity over SSH,
+    # so it's a session length, not idle detection.
+    _max_session = 4 * 60 * 60
+    # Default rsync exclude arguments, built once
+    _default_rsync_excludes = tuple(
+        arg
+        for pattern in (
+            '.git/',
+            '__pycache__/',
+            '*.pyc',
+            '.DS_Store',
+            'node_modules/',
+            '.env',
+            '.agentconfig',
+            '*.log',
+        )
+        for arg in ('--exclude', pattern)
+    )
+
     def __init__(self):
         self.config_file = '.agentconfig'
-        self.repo_name = Path.cwd().name
+        self._config = None  # parsed .agentconfig, loaded on first use
+        self._last_print = 0.0  # monotonic time of the last status redraw
         
         # Get Linode token from environment
-        token = os.getenv('LINODE_TOKEN')
-        if not token:
+        self._token = os.getenv('LINODE_TOKEN')
+        if not self._token:
             self._setup_token()
             exit(1)
             
-        self.linode = LinodeClient(token)
+    @cached_property
+    def linode(self):
+        """Linode API client, created on first use so 'init' never loads the SDK"""
+        try:
+            from linode_api4 import LinodeClient
+            from requests.adapters import HTTPAdapter
+        except ImportError:
+            print("Please install: pip install linode-api4")
+            exit(1)
+            
+        # One client = one keep-alive requests.Session for every API call. The SDK's
+        # transport-level retry covers 408/429/502; add the other transient gateway errors.
+        client = LinodeClient(
+            self._token,
+            page_size=500,  # API maximum: any list fits in one request instead of paging by 100
+            retry_rate_limit_interval=1.5,
+            retry_max=5,
+            retry_statuses=[503, 504],
+        )
+        
+        # Fleet/pool launches hit the API from up to 15 threads; requests keeps only 10
+        # idle connections per host by default and would drop (and later re-handshake)
+        # the rest. Remount with a bigger pool.
+        # The SDK's retry also replays POSTs, and a create that timed out at the gateway
+        # may have gone through, so only idempotent methods retry here. Every POST in
+        # this file goes through _retry_rate_limited, which retries just 408/429.
+        retry = client.session.get_adapter('https://').max_retries.new(
+            allowed_methods=frozenset(['GET', 'PUT', 'DELETE'])
+        )
+        client.session.mount('https://', HTTPAdapter(pool_maxsize=15, max_retries=retry))
+        return client
+        
+    @cached_property
+    def _ssh_opts(self):
+        """Options for every ssh/rsync call"""
+        # Multiplex ssh/rsync over one connection per host: the first call opens a
+        # master socket, later calls skip the TCP/key-exchange/auth handshake. The
+        # socket must live somewhere only this user can write (see ssh_config(5)),
+        # or another local user could plant one and hijack the session.
+        ssh_dir = os.path.expanduser('~/.ssh')
+        os.makedirs(ssh_dir, mode=0o700, exist_ok=True)
+        return [
+            '-o', 'StrictHostKeyChecking=no',
+            '-o', 'ControlMaster=auto',
+            '-o', f'ControlPath={ssh_dir}/agent-%C',
+            '-o', 'ControlPersist=60s',
+        ]
+
+    @cached_property
+    def repo_name(self):
+        return Path.cwd().name
+
+    @cached_property
+    def _rsync_version_output(self):
+        """Output of the local 'rsync --version', empty if rsync can't be run"""
+        try:
+            return subprocess.run(['rsync', '--version'], capture_output=True, text=True).stdout
+        except OSError:
+            return ''
+
+    @cached_property
+    def _rsync_version(self):
+        """Local rsync version as a tuple, (0, 0) if it can't be determined"""
+        match = re.search(r'version (\d+)\.(\d+)', self._rsync_version_output)
+        return (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+
+    @cached_property
+    def _rsync_zstd(self):
+        """Whether the local rsync was built with zstd (3.2+ can be built without it)"""
+        # "Compress list:" is followed by the algorithms, on the same or the next line
+        match = re.search(r'Compress list:\s+(.*)', self._rsync_version_output)
+        return bool(match) and 'zstd' in match.group(1).split()
+
+    @cached_property
+    def _authorized_keys(self):
+        """Local public keys to install on new VMs, so ssh/rsync never need the password"""
+        candidates = ('~/.ssh/id_ed25519.pub', '~/.ssh/id_ecdsa.pub', '~/.ssh/id_rsa.pub')
+        return [key for key in candidates if os.path.exists(os.path.expanduser(key))]
+
+    @cached_property
+    def _profile_file(self):
+        """Shell profile to add LINODE_TOKEN to"""
+        shell = os.path.basename(os.environ.get('SHELL', '/bin/bash'))
+        return os.path.join(os.path.expanduser('~'), _PROFILE_FILES.get(shell, '.profile'))
         
     def _setup_token(self):
         """Interactive token setup"""
@@ -57,16 +185,19 @@ class AgentVM:
             print("❌ No token provided")
             return
             
-        # Detect shell and OS
-        shell = os.environ.get('SHELL', '/bin/bash').split('/')[-1]
-        home = os.path.expanduser('~')
-        
-        if shell == 'zsh':
-            profile_file = f"{home}/.zshrc"
-        elif shell == 'bash':
-            profile_file = f"{home}/.bashrc"
-        else:
-            profile_file = f"{home}/.profile"
+        profile_file = self._profile_file
+            
+        # Don't stack up duplicate exports when init is re-run before reloading the shell
+        try:
+            with open(profile_file) as f:
+                existing = f.read()
+        except FileNotFoundError:
+            existing = ''
+        if 'LINODE_TOKEN' in existing:
+            print(f"\n⚠️  LINODE_TOKEN is already set in {profile_file}")
+            print(f"\n🔄 Run this to reload your shell:")
+            print(f"   source {profile_file}")
+            return
             
         print(f"\n💾 Adding LINODE_TOKEN to {profile_file}")
         
@@ -74,8 +205,14 @@ class AgentVM:
         export_line = f'export LINODE_TOKEN="{token}"\n'
         
         try:
-            with open(profile_file, 'a') as f:
-                f.write(f'\n# Agent VM tool\n{export_line}')
+            # One O_APPEND write lands atomically even if another shell appends at the
+            # same time; a newly created profile is private since it holds the token
+            os.makedirs(os.path.dirname(profile_file), exist_ok=True)
+            fd = os.open(profile_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC, 0o600)
+            try:
+                os.write(fd, f'\n# Agent VM tool\n{export_line}'.encode())
+            finally:
+                os.close(fd)
             
             print("✅ Token added to your shell profile!")
             print(f"\n🔄 Run this to reload your shell:")
@@ -91,19 +228,21 @@ class AgentVM:
         
     def _wait_for_boot(self, instance: Instance):
         """Wait for instance to boot and be SSH-ready"""
-        import sys
-        
         start_time = time.time()
         last_status = None
         status_start_time = start_time
         
-        # Wait for instance to be running
+        # Wait for instance to be running: short boots are noticed quickly, long ones
+        # back off (0.5s, 0.75s, 1.1s... up to 10s) instead of burning API quota
+        delay = 0.5
         while instance.status != 'running':
-            time.sleep(5)
-            instance = self.linode.linode.instances(Instance.id == instance.id)[0]
+            time.sleep(delay)
+            delay = min(delay * 1.5, 10)
+            instance.invalidate()  # next attribute access re-fetches just this instance
             
             # Track status changes
-            if instance.status != last_status:
+            status_changed = instance.status != last_status
+            if status_changed:
                 if last_status is not None:
                     print()  # New line when status changes
                 last_status = instance.status
@@ -113,34 +252,109 @@ class AgentVM:
             elapsed_in_status = int(time.time() - status_start_time)
             total_elapsed = int(time.time() - start_time)
             
-            print(f"\r⏳ Status: {instance.status} ({elapsed_in_status}s) | Total: {total_elapsed}s", end='', flush=True)
+            self._print_status(f"{instance.status} ({elapsed_in_status}s) | Total: {total_elapsed}s", force=status_changed)
+        
+        print()
+        self._wait_for_ssh(instance, start_time)
+
+    def _wait_for_running(self, instances, timeout=600):
+        """Wait for several instances to be running, with one list request per poll.
+        Returns (start_time, running instances); stragglers are given up on at the deadline."""
+        start_time = time.time()
+        ids = [i.id for i in instances]
+        delay = 0.5
+        
+        while True:
+            statuses = self._poll_many(ids)
+            running = [i for i in ids if statuses.get(i) == 'running']
+            self._print_status(f"{len(running)}/{len(ids)} running | Total: {int(time.time() - start_time)}s")
+            if len(running) == len(ids) or time.time() - start_time >= timeout:
+                break
+            time.sleep(delay)
+            delay = min(delay * 1.5, 10)
+            
+        print()
+        stuck = [i for i in ids if i not in running]
+        if stuck:
+            print(f"⚠️  VMs not running after {timeout // 60} min: {', '.join(map(str, stuck))}")
+            print("You may want to delete them manually: https://cloud.linode.com/linodes")
+        return start_time, [i for i in instances if i.id in running]
+
+    def _poll_many(self, ids):
+        """Map instance id -> status for the given instances"""
+        from linode_api4 import Instance
         
-        # Wait for SSH to be ready
-        print(f"\n⏳ Status: ssh_ready (0s) | Total: {int(time.time() - start_time)}s", end='', flush=True)
+        if len(ids) == 1:
+            # A single instance is one direct GET, no list filter needed
+            instance = self.linode.load(Instance, ids[0])
+            return {instance.id: instance.status}
+            
+        # Filters combine pairwise with |, so fold them into one "+or" filter
+        id_filter = reduce(operator.or_, (Instance.id == i for i in ids))
+        return {i.id: i.status for i in self.linode.linode.instances(id_filter)}
+
+    def _wait_for_ssh(self, instance: Instance, start_time):
+        """Wait for sshd to answer on a running instance"""
+        self._print_status(f"ssh_ready (0s) | Total: {int(time.time() - start_time)}s", force=True)
         ssh_start = time.time()
+        ip = instance.ipv4[0]
+        deadline = ssh_start + 180  # 3 minutes max for sshd to come up
+        delay = 0.5
         
-        for i in range(30):
-            time.sleep(1)
+        while not self._ssh_ready(ip):
+            if time.time() >= deadline:
+                print("\n⚠️  SSH not answering yet, continuing anyway...")
+                return
+            time.sleep(delay)
+            delay = min(delay * 1.5, 5)
             ssh_elapsed = int(time.time() - ssh_start)
             total_elapsed = int(time.time() - start_time)
-            print(f"\r⏳ Status: ssh_ready ({ssh_elapsed}s) | Total: {total_elapsed}s", end='', flush=True)
+            self._print_status(f"ssh_ready ({ssh_elapsed}s) | Total: {total_elapsed}s")
             
         print("\n✅ VM is ready!")
+
+    def _print_status(self, message, force=False):
+        """Redraw the status line, at most once a second unless forced"""
+        import sys
+        
+        now = time.monotonic()
+        if not force and now - self._last_print < 1.0:
+            return
+        self._last_print = now
+        sys.stdout.write(f"\r⏳ Status: {message}")
+        sys.stdout.flush()
+
+    @staticmethod
+    def _ssh_ready(ip, port=22, timeout=2):
+        """Check whether sshd is answering on the instance"""
+        try:
+            with socket.create_connection((ip, port), timeout=timeout) as s:
+                # An open port alone may just be the network stack; sshd greets with its
+                # identification line (RFC 4253 caps it at 255 bytes)
+                with s.makefile('rb') as f:
+                    return f.readline(255).startswith(b"SSH-")
+        except OSError:
+            return False
     
     def _wait_for_image(self, image: Image):
         """Wait for image to be ready"""
         print("🖼️  Waiting for image to be ready...")
 
-        wait_time = 0
+        start = time.monotonic()
         max_wait_time = 600  # 10 minutes max for image creation
+        scale = 95 / max_wait_time  # Percentage per second of typical creation time
+        polls = 0
         
         while image.status != 'available':
-            time.sleep(10)
-            wait_time += 10
+            # Images take minutes, so back off: 5s, 7.5s, 11s... up to 60s
+            remaining = max_wait_time - (time.monotonic() - start)
+            time.sleep(max(min(5 * (1.5 ** polls), 60, remaining), 0))
+            polls += 1
             image._api_get()
             
-            # Calculate percentage based on typical image creation time
-            percentage = min(int((wait_time / max_wait_time) * 95), 95)
+            # Measure real elapsed time; sleep() can return early or late
+            wait_time = time.monotonic() - start
+            percentage = min(int(wait_time * scale), 95)
             print(f"   Status: {image.status.title()} ({percentage}%)")
             
             if wait_time >= max_wait_time:
@@ -151,27 +365,46 @@ class AgentVM:
 
     def _save_config(self, config):
         """Save configuration to .agentconfig"""
-        with open(self.config_file, 'w') as f:
-            json.dump(config, f, indent=2)
+        data = json.dumps(config, indent=2)
+        try:
+            with open(self.config_file, 'r') as f:
+                unchanged = f.read() == data
+        except FileNotFoundError:
+            unchanged = False
+            
+        if not unchanged:
+            # Write-then-rename so an interrupted save never leaves a truncated config.
+            # fsync before the rename so a crash can't expose an empty file either;
+            # 0600 because the config holds the VMs' root password.
+            tmp_file = self.config_file + '.tmp'
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            try:
+                os.write(fd, data.encode())
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(tmp_file, self.config_file)
+        self._config = dict(config)
             
     def _load_config(self):
-        """Load configuration from .agentconfig"""
-        if not os.path.exists(self.config_file):
-            return {}
-        with open(self.config_file, 'r') as f:
-            return json.load(f)
+        """Load configuration from .agentconfig (cached after the first read)"""
+        if self._config is None:
+            try:
+                self._config = json.loads(Path(self.config_file).read_bytes())
+            except FileNotFoundError:
+                return {}
+        # Hand out a copy so callers can mutate it before saving
+        return dict(self._config)
             
-    def _interactive_session(self, config: Config, instance: Instance, session_type="editing"):
+    def _interactive_session(self, ip: str, password: str, session_type="editing"):
         """Show SSH details and wait for user to save or cancel"""
-        ip = instance.ipv4[0]
-        
         print(f"""
 🚀 VM Ready for {session_type}!
 
 SSH Details:
   Host: {ip}
   User: root
-  Password: {config['root_password']}
+  Password: {password}
 
 SSH Command:
   ssh root@{ip}
@@ -184,9 +417,24 @@ When you're done configuring:
   [Ctrl+C] Cancel and destroy VM
 """)
         
+        import select
+        import sys
+
+        print("Press Enter when ready to save...", end='', flush=True)
+        start = time.time()
         try:
-            input("Press Enter when ready to save...")
-            return True  # User wants to save
+            while True:
+                ready, _, _ = select.select([sys.stdin], [], [], 60)
+                if ready:
+                    if not sys.stdin.readline():
+                        # EOF (stdin closed or Ctrl+D) is not a request to save
+                        print("\n🗑️  Input closed, cancelling and destroying VM...")
+                        return False
+                    return True  # User wants to save
+                if time.time() - start > self._max_session:
+                    # The user may have been working over SSH all along; keep their work
+                    print(f"\n⏰ Session reached {self._max_session // 3600}h, saving and destroying VM...")
+                    return True
         except KeyboardInterrupt:
             print("\n🗑️  Cancelling and destroying VM...")
             return False  # User cancelled
@@ -205,19 +453,44 @@ When you're done configuring:
             'base_image_id': 'linode/ubuntu22.04',
             'instance_type': 'g6-nanode-1', # $5/month instance
             'created_at': int(time.time()),
-            'root_password': Instance.generate_root_password()
+            'root_password': _generate_root_password()
         }
         self._save_config(config)
 
+    def _create_instance(self, **kwargs):
+        """Create an instance, throttled and retried when Linode rate-limits the request"""
+        def create():
+            with self._create_slots:
+                return self.linode.linode.instance_create(**kwargs)
+        return self._retry_rate_limited(create)
+
+    def _retry_rate_limited(self, call, *args, **kwargs):
+        """Run a POST API call, retrying when Linode rate-limits it"""
+        from linode_api4.errors import ApiError
+        
+        attempts = 8
+        for attempt in range(attempts):
+            try:
+                return call(*args, **kwargs)
+            except ApiError as e:
+                # Only statuses that mean the request wasn't processed; after a 5xx a
+                # create may have happened anyway, so retrying could double-bill
+                if e.status not in (408, 429) or attempt == attempts - 1:
+                    raise
+                # Jitter keeps parallel invocations from retrying in lockstep
+                delay = min(20 * (2 ** attempt), 120) + random.uniform(0, 5)
+                print(f"⏳ Linode is busy ({e.status}), retrying in {int(delay)}s...")
+                time.sleep(delay)
+
     def _create_vm(self, config: Config):        
         # Create VM
         try:
-            instance = self.linode.linode.instance_create(
+            instance = self._create_instance(
                 ltype=config['instance_type'],
                 region='us-east',
                 image=config['base_image_id'],
                 root_pass=config['root_password'],
-                authorized_keys=["~/.ssh/id_rsa.pub"]
+                authorized_keys=self._authorized_keys or None
             )
         except Exception as e:
             print(f"❌ Failed to create VM: {e}")
@@ -225,35 +498,81 @@ When you're done configuring:
             
         print(f"✅ VM created: {instance.label}")
         return instance
-            
-    def edit_environment(self):
-        """Edit existing environment"""
+
+    def _launch_vm(self, config: Config):
+        """Create a VM and wait until it is SSH-ready"""
+        instance = self._create_vm(config)
+        if instance:
+            self._wait_for_boot(instance)
+        return instance
+
+    def _load_environment(self):
+        """Load config, or explain how to create one if the project isn't initialized"""
         config = self._load_config()
-        
         if not config.get('base_image_id'):
             print("❌ No environment found. Run 'agent init' first.")
+            return None
+        return config
+
+    def _snapshot(self, disk_id: int):
+        """Capture the instance's boot disk as the project's base image"""
+        image = self._retry_rate_limited(
+            self.linode.images.create,
+            disk_id,
+            label=f"agent-{self.repo_name}-base"
+        )
+        self._wait_for_image(image)
+        return image
+
+    def _launch_vms(self, configs):
+        """Launch several VMs concurrently (the SDK is blocking, so use threads)"""
+        if not configs:
+            return []
+            
+        # Linode accepts at most 15 instances per batch; creates are further
+        # throttled by _create_slots
+        with ThreadPoolExecutor(max_workers=min(len(configs), 15)) as pool:
+            instances = [i for i in pool.map(self._create_vm, configs) if i]
+            if not instances:
+                return []
+                
+            try:
+                # One status request per tick covers every VM, then probe sshd in parallel
+                start_time, instances = self._wait_for_running(instances)
+                list(pool.map(lambda i: self._wait_for_ssh(i, start_time), instances))
+            except Exception:
+                # Don't lose track of VMs that already exist and are billing
+                print(f"\n❌ Failed while booting VMs: {', '.join(str(i.id) for i in instances)}")
+                print("You may want to delete them manually: https://cloud.linode.com/linodes")
+                raise
+        return instances
+            
+    def edit_environment(self):
+        """Edit existing environment"""
+        config = self._load_environment()
+        if not config:
             return
             
         print("🔧 Spinning up environment for editing...")
 
         # Spin up an instance
-        instance = self._create_vm(config)
-        self._wait_for_boot(instance)
+        instance = self._launch_vm(config)
+        if not instance:
+            return
 
         try:            
+            ip = instance.ipv4[0]
+            # Look up the boot disk now (the SDK re-fetches .disks on every access), so
+            # saving after the session is a single POST
+            disk_id = instance.disks[0].id
+
             # Interactive setup session
-            should_save = self._interactive_session(config, instance, "setup")
+            should_save = self._interactive_session(ip, config['root_password'], "setup")
             
             if should_save:
                 print("💾 Saving configured environment...")
                 
-                # Create image from VM
-                disk_id = instance.disks[0].id
-                image = self.linode.images.create(
-                    disk_id,
-                    label=f"agent-{self.repo_name}-base"
-                )
-                self._wait_for_image(image)
+                image = self._snapshot(disk_id)
 
                 print("✅ Environment saved!")
                 config['base_image_id'] = image.__getattribute__("id")
@@ -265,57 +584,172 @@ When you're done configuring:
             
     def build_session(self, instance_id=None):
         """Start a build session"""
-        config = self._load_config()
+        from linode_api4 import Instance
+        from linode_api4.errors import ApiError
         
-        if not config.get('base_image_id'):
-            print("❌ No environment found. Run 'agent init' first.")
+        config = self._load_environment()
+        if not config:
             return
             
         try:
             if instance_id:
                 print(f"🔗 Connecting to existing VM (ID: {instance_id})...")
                 
-                # Fetch existing instance
-                instance = self.linode.linode.instances(Instance.id == int(instance_id))[0]
+                # Fetch existing instance (GET /linode/instances/{id}, not a filtered list)
+                try:
+                    instance = self.linode.load(Instance, int(instance_id))
+                except ApiError as e:
+                    if e.status != 404:
+                        raise
+                    print(f"❌ No VM found with ID {instance_id}")
+                    return
                 print(f"✅ Found existing VM: {instance.label}")
             else:
                 print("🤖 Starting build session...")
                 
-                # Spin up an instance
-                instance = self._create_vm(config)
-                self._wait_for_boot(instance)
+                # Take a pre-booted VM if there is one, otherwise spin one up
+                instance = self._lease_pooled_vm() or self._launch_vm(config)
+                if not instance:
+                    return
                     
             ip = instance.ipv4[0]
             password = config['root_password']
             
             # Example: Sync current repo to VM
-            # self._rsync(config, instance)
+            # self._rsync(ip)
             
             # Example: Sync specific folder to custom path
-            self._rsync(config, instance, local_path="./", remote_path="/root/workspace")
+            self._rsync(ip, local_path="./", remote_path="/root/workspace")
             
             # Example: Run setup commands after sync
-            # self._ssh(config, instance, "date >> auto.txt")
-            # self._ssh(config, instance, "apt update && apt install -y htop")
-            # self._ssh(config, instance, "bash /root/code/setup.sh")
+            # self._ssh(ip, "date >> auto.txt")
+            # Packages belong in the image (install them during 'agent edit'); if a
+            # build must install something, guard it so baked images skip the apt run:
+            # self._ssh(ip, "test -f /var/lib/agent-vm/provisioned || (apt update && apt install -y htop && mkdir -p /var/lib/agent-vm && touch /var/lib/agent-vm/provisioned)")
+            # self._ssh(ip, "bash /root/code/setup.sh")
             
-            self._ssh(config, instance)
+            self._ssh(ip)
                 
         except Exception as e:
             print(f"❌ Failed to create VM: {e}")
             print("You may want to delete the VM manually: https://cloud.linode.com/linodes")
 
-    def _ssh(self, config: Config, instance: Instance, command=None):
+    def fill_pool(self, size: int):
+        """Grow or shrink the pool of pre-booted VMs that 'agent build' uses"""
+        from linode_api4 import Instance
+        from linode_api4.errors import ApiError
+        
+        config = self._load_environment()
+        if not config:
+            return
+            
+        config['pool'] = pool = list(config.get('pool', []))
+        missing = size - len(pool)
+        if missing == 0:
+            print(f"✅ Pool already has {len(pool)} VMs")
+            return
+            
+        if missing < 0:
+            # Pooled VMs bill at the full rate, so delete the extras ('pool --size 0' drains it)
+            print(f"🧹 Deleting {-missing} pool VMs...")
+            while len(pool) > size:
+                try:
+                    Instance(self.linode, pool[-1]['id']).delete()
+                except ApiError as e:
+                    if e.status != 404:
+                        self._save_config(config)  # Keep tracking what's left
+                        raise
+                pool.pop()
+            self._save_config(config)
+            print(f"✅ Pool has {len(pool)} VMs")
+            return
+            
+        print(f"🏊 Booting {missing} VMs for the pool...")
+        image_id = config['base_image_id']
+        instances = self._launch_vms([config] * missing)
+        
+        # Booting takes minutes; re-read so VMs a concurrent 'agent build' leased
+        # meanwhile don't get written back into the pool
+        self._config = None
+        config = self._load_config()
+        config['pool'] = list(config.get('pool', [])) + [
+            {'id': i.id, 'image': image_id} for i in instances
+        ]
+        self._save_config(config)
+        print(f"✅ Pool has {len(config['pool'])} VMs ready")
+
+    def _lease_pooled_vm(self):
+        """Take a VM out of the pool, or None if no usable one is left"""
+        from linode_api4 import Instance
+        from linode_api4.errors import ApiError
+        
+        while True:
+            # Re-read the file so a concurrent 'agent build' that already leased a VM
+            # is seen. This narrows the race but doesn't close it (there's no file lock):
+            # two builds starting at the same instant can still get the same VM.
+            self._config = None
+            config = self._load_config()
+            config['pool'] = pool = list(config.get('pool', []))
+            if not pool:
+                return None
+            entry = pool.pop(0)
+            self._save_config(config)
+            
+            try:
+                instance = self.linode.load(Instance, entry['id'])
+            except ApiError as e:
+                if e.status == 404:
+                    continue  # Deleted since it was pooled
+                # Transient/auth error: the VM may still exist, so keep tracking it
+                config['pool'] = [entry] + pool
+                self._save_config(config)
+                raise
+                
+            if entry['image'] != config['base_image_id']:
+                # Booted from an image that 'agent edit' has since replaced
+                print(f"🧹 Deleting outdated pool VM {instance.id}...")
+                instance.delete()
+                continue
+                
+            print(f"✅ Using pre-booted VM: {instance.label}")
+            if instance.status != 'running':
+                if instance.status == 'offline':
+                    self._retry_rate_limited(instance.boot)
+                self._wait_for_boot(instance)
+            return instance
+
+    def build_fleet(self, count: int):
+        """Start several build VMs at once"""
+        config = self._load_environment()
+        if not config:
+            return
+            
+        print(f"🤖 Starting {count} build VMs...")
+        
+        # Same root password as every other build VM, so 'build --continue' and
+        # password logins keep working for the whole fleet
+        configs = [config] * count
+        hosts = [(i.id, i.ipv4[0]) for i in self._launch_vms(configs)]
+        
+        for _, ip in hosts:
+            self._rsync(ip, local_path="./", remote_path="/root/workspace")
+            
+        print(f"\n✅ {len(hosts)}/{count} VMs ready:")
+        for instance_id, ip in hosts:
+            print(f"   {instance_id}  root@{ip}")
+        print("\nConnect with: python agent.py build --continue <linode_id>")
+
+    def _ssh(self, ip: str, command=None):
         """SSH to instance - either interactive session or execute command"""
-        ip = instance.ipv4[0]
+        # argv list, no local shell: one less fork and no quoting issues in command
+        ssh_cmd = ['ssh', *self._ssh_opts, f'root@{ip}']
         
         if command:
             # Execute a specific command and return result
-            ssh_cmd = f"ssh -o StrictHostKeyChecking=no root@{ip} '{command}'"
             print(f"🔧 Executing: {command}")
             
             try:
-                result = subprocess.run(ssh_cmd, shell=True, capture_output=True, text=True)
+                result = subprocess.run([*ssh_cmd, command], capture_output=True, text=True)
                 if result.stdout:
                     print("Output:", result.stdout.strip())
                 if result.stderr:
@@ -325,14 +759,15 @@ When you're done configuring:
                 print(f"⚠️  Command failed: {e}")
                 return None
         else:
-            # Open interactive SSH session
-            ssh_cmd = f"ssh -o StrictHostKeyChecking=no root@{ip}"
-            print("🚀 SSH session starting...")
-            subprocess.run(ssh_cmd, shell=True)
+            # Open interactive SSH session by replacing this process with ssh: no
+            # idle Python left resident, and the terminal's signals go straight to ssh.
+            # Never returns.
+            print("🚀 SSH session starting...", flush=True)
+            os.execvp('ssh', ssh_cmd)
 
-    def _rsync(self, config: Config, instance: Instance, local_path=None, remote_path="/root/code", exclude_patterns=None):
+    def _rsync(self, ip: str, local_path=None, remote_path="/root/code", exclude_patterns=None):
         """Rsync files from local to remote VM"""
-        ip = instance.ipv4[0]
+        import sys
         
         # Default to current working directory if no local path specified
         if local_path is None:
@@ -342,30 +777,33 @@ When you're done configuring:
         if not local_path.endswith('/'):
             local_path += '/'
             
-        # Default exclude patterns
+        # Build exclude arguments
         if exclude_patterns is None:
-            exclude_patterns = [
-                '.git/',
-                '__pycache__/',
-                '*.pyc',
-                '.DS_Store',
-                'node_modules/',
-                '.env',
-                '.agentconfig',
-                '*.log'
-            ]
+            exclude_args = self._default_rsync_excludes
+        else:
+            exclude_args = [arg for pattern in exclude_patterns for arg in ('--exclude', pattern)]
         
-        # Build exclude arguments
-        exclude_args = []
-        for pattern in exclude_patterns:
-            exclude_args.extend(['--exclude', pattern])
+        # Live overall progress plus a stats summary instead of a per-file listing;
+        # rsync < 3.1 (e.g. macOS's 2.6.9) only knows --stats
+        if self._rsync_version >= (3, 1):
+            report_args = ['--info=stats2,progress2']
+        else:
+            report_args = ['--stats']
+            
+        # zstd compresses several times faster than zlib for similar ratios
+        if self._rsync_zstd:
+            compress_args = ['--compress-choice=zstd', '--compress-level=1']
+        else:
+            compress_args = ['-z']
         
         # Build rsync command
         rsync_cmd = [
             'rsync',
-            '-avz',  # archive, verbose, compress
+            '-a',  # archive
+            *compress_args,
+            *report_args,
             '--delete',  # delete files on remote that don't exist locally
-            '-e', 'ssh -o StrictHostKeyChecking=no',  # SSH options
+            '-e', shlex.join(['ssh', *self._ssh_opts]),  # SSH options
             *exclude_args,
             local_path,
             f'root@{ip}:{remote_path}'
@@ -374,22 +812,38 @@ When you're done configuring:
         print(f"📁 Syncing {local_path} → root@{ip}:{remote_path}")
         
         try:
-            result = subprocess.run(rsync_cmd, capture_output=True, text=True)
+            # Stream stdout line by line (progress updates end in \r, which text mode
+            # treats as a line break) rather than buffering the whole transfer log;
+            # stderr goes straight to the terminal
+            proc = subprocess.Popen(rsync_cmd, stdout=subprocess.PIPE, text=True)
+            file_count = 0
+            progress = None
+            next_print = 0.0
+            for line in proc.stdout:
+                line = line.strip()
+                match = re.match(r'Number of (?:regular )?files transferred: ([\d,]+)', line)
+                if match:
+                    file_count = int(match.group(1).replace(',', ''))
+                elif line[:1].isdigit():
+                    # rsync reports progress many times a second; redraw at most 2x/s
+                    progress = line
+                    if time.monotonic() >= next_print:
+                        next_print = time.monotonic() + 0.5
+                        sys.stdout.write(f"\r   {progress:<70}")
+                        sys.stdout.flush()
+            proc.wait()
+            if progress:
+                sys.stdout.write(f"\r   {progress:<70}")  # Final totals
+            print()
             
-            if result.returncode == 0:
+            if proc.returncode == 0:
                 print("✅ Sync completed successfully")
-                if result.stdout:
-                    # Show a summary of what was synced
-                    lines = result.stdout.strip().split('\n')
-                    file_count = len([line for line in lines if line and not line.startswith('building') and not line.startswith('sent')])
-                    if file_count > 0:
-                        print(f"📊 Synced {file_count} files/directories")
+                if file_count > 0:
+                    print(f"📊 Synced {file_count} files")
             else:
                 print("❌ Sync failed")
-                if result.stderr:
-                    print("Errors:", result.stderr.strip())
                     
-            return result
+            return proc
             
         except Exception as e:
             print(f"⚠️  Rsync failed: {e}")
@@ -399,7 +853,7 @@ def main():
     import sys
     
     if len(sys.argv) < 2:
-        print("Usage: python agent.py [init|edit|build [--continue <linode_id>]]")
+        print("Usage: python agent.py [init|edit|build [--continue <linode_id> | --count <n>]|pool --size <n>]")
         return
         
     command = sys.argv[1]
@@ -414,12 +868,19 @@ def main():
         if len(sys.argv) >= 4 and sys.argv[2] == '--continue':
             instance_id = sys.argv[3]
             agent.build_session(instance_id=instance_id)
+        elif len(sys.argv) >= 4 and sys.argv[2] == '--count' and sys.argv[3].isdigit():
+            agent.build_fleet(int(sys.argv[3]))
         elif len(sys.argv) == 2:
             agent.build_session()
         else:
-            print("Usage for build: python agent.py build [--continue <linode_id>]")
+            print("Usage for build: python agent.py build [--continue <linode_id> | --count <n>]")
+    elif command == 'pool':
+        if len(sys.argv) >= 4 and sys.argv[2] == '--size' and sys.argv[3].isdigit():
+            agent.fill_pool(int(sys.argv[3]))
+        else:
+            print("Usage for pool: python agent.py pool --size <n>")
     else:
-        print("Unknown command. Use: init, edit, or build")
+        print("Unknown command. Use: init, edit, build, or pool")
 
 
 if __name__ == '__main__':